@@ -0,0 +1,33 @@
+#!/usr/bin/env python3
+"""
+Single entry point for the analysis reports.
+Runs one report, or all of them in one process, so the pandas/matplotlib imports, the case cache
+and the cached error table are loaded once instead of once per script.
+Usage: python3 analyze.py [--report quick|public|capture|visualize|all]
+"""
+
+import argparse
+import importlib
+
+# Report name -> module whose main() produces it, in the order 'all' runs them.
+# capture precedes visualize because visualize reads the results.json that capture writes.
+REPORTS = {
+    'quick': 'quick_eval',
+    'public': 'analyze_public_cases',
+    'capture': 'capture_raw_results',
+    'visualize': 'visualize_results',
+}
+
+def main():
+    parser = argparse.ArgumentParser(description='Run reimbursement analysis reports.')
+    parser.add_argument('--report', choices=list(REPORTS) + ['all'], default='all',
+                        help='report to run (default: all)')
+    args = parser.parse_args()
+
+    names = list(REPORTS) if args.report == 'all' else [args.report]
+    for name in names:
+        # Import on demand so a single report only pays for the libraries it uses
+        importlib.import_module(REPORTS[name]).main()
+
+if __name__ == '__main__':
+    main()
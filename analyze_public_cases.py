@@ -4,127 +4,128 @@ Comprehensive Analysis of Public Test Cases
 Analyzes the reimbursement patterns across multiple dimensions to understand the black box system.
 """
 
-import json
 import numpy as np
 import pandas as pd
+import matplotlib
+matplotlib.use('Agg')  # figures are only saved to files, so skip interactive backend setup
 import matplotlib.pyplot as plt
-import seaborn as sns
-from legacy_calculate import calculate_legacy_reimbursement
+from matplotlib.colors import LinearSegmentedColormap, LogNorm
+
+# Column order of the processed table (and of the Parquet file written by main)
+ANALYSIS_COLUMNS = ['trip_duration_days', 'miles_traveled', 'total_receipts_amount', 'expected_output',
+                    'predicted_output', 'error', 'abs_error', 'miles_per_day', 'receipts_per_day']
+
+# Panels with at least this many points are aggregated rather than drawn point by point: scatters are
+# rasterized with datashader (when installed) and the 3D input-space panel becomes a hexbin
+RASTERIZE_MIN_POINTS = 100_000
+
+# Category bins: trip duration bins are closed on the right (whole days), the rate and
+# amount bins on the left, so e.g. exactly 50 mi/day falls in "50-100 mi/day"
+DURATION_BINS = [-np.inf, 1, 3, 5, 7, 10, np.inf]
+DURATION_LABELS = ["1 day", "2-3 days", "4-5 days", "6-7 days", "8-10 days", "11+ days"]
+MILEAGE_BINS = [-np.inf, 50, 100, 150, 200, 300, np.inf]
+MILEAGE_LABELS = ["<50 mi/day", "50-100 mi/day", "100-150 mi/day", "150-200 mi/day", "200-300 mi/day", "300+ mi/day"]
+RECEIPT_BINS = [-np.inf, 30, 75, 150, 250, np.inf]
+RECEIPT_LABELS = ["Very Low (<$30/day)", "Low ($30-75/day)", "Medium ($75-150/day)", "High ($150-250/day)",
+                  "Very High (>$250/day)"]
+TOTAL_RECEIPT_BINS = [-np.inf, 50, 200, 500, 1000, np.inf]
+TOTAL_RECEIPT_LABELS = ["Very Low (<$50)", "Low ($50-200)", "Medium ($200-500)", "High ($500-1000)",
+                        "Very High (>$1000)"]
 
 def load_public_cases():
     """Load and process public test cases"""
-    with open('public_cases.json', 'r') as f:
-        cases = json.load(f)
-    
-    # Convert to DataFrame for easier analysis
-    data = []
-    for case in cases:
-        inp = case['input']
-        expected = case['expected_output']
-        
-        # Calculate derived metrics
-        miles_per_day = inp['miles_traveled'] / inp['trip_duration_days'] if inp['trip_duration_days'] > 0 else 0
-        receipts_per_day = inp['total_receipts_amount'] / inp['trip_duration_days'] if inp['trip_duration_days'] > 0 else 0
-        
-        # Get our algorithm prediction
-        predicted = calculate_legacy_reimbursement(
-            inp['trip_duration_days'], 
-            inp['miles_traveled'], 
-            inp['total_receipts_amount']
-        )
-        
-        data.append({
-            'trip_duration_days': inp['trip_duration_days'],
-            'miles_traveled': inp['miles_traveled'],
-            'total_receipts_amount': inp['total_receipts_amount'],
-            'expected_output': expected,
-            'predicted_output': predicted,
-            'error': predicted - expected,
-            'abs_error': abs(predicted - expected),
-            'miles_per_day': miles_per_day,
-            'receipts_per_day': receipts_per_day,
-            # Categorical features for analysis
-            'duration_category': categorize_duration(inp['trip_duration_days']),
-            'mileage_category': categorize_mileage(miles_per_day),
-            'receipt_category': categorize_receipts(receipts_per_day),
-            'total_receipt_category': categorize_total_receipts(inp['total_receipts_amount'])
-        })
-    
-    return pd.DataFrame(data)
+    # Predictions and errors come from the shared error table rather than a fresh pass over the cases
+    from error_table import DF
+    # Trip lengths fit in int16; dollar and rate columns stay float64 so cent-level stats and bin edges are exact
+    df = DF[ANALYSIS_COLUMNS].astype({'trip_duration_days': 'int16'})
+    
+    # Categorical features for analysis: ordered categoricals, so groupbys work on integer codes
+    df['duration_category'] = pd.cut(df['trip_duration_days'], DURATION_BINS, labels=DURATION_LABELS, ordered=True)
+    df['mileage_category'] = pd.cut(df['miles_per_day'], MILEAGE_BINS, labels=MILEAGE_LABELS,
+                                    right=False, ordered=True)
+    df['receipt_category'] = pd.cut(df['receipts_per_day'], RECEIPT_BINS, labels=RECEIPT_LABELS,
+                                    right=False, ordered=True)
+    df['total_receipt_category'] = pd.cut(df['total_receipts_amount'], TOTAL_RECEIPT_BINS,
+                                          labels=TOTAL_RECEIPT_LABELS, right=False, ordered=True)
+    return df
 
-def categorize_duration(days):
-    """Categorize trip duration"""
-    if days == 1:
-        return "1 day"
-    elif days in [2, 3]:
-        return "2-3 days"
-    elif days in [4, 5]:
-        return "4-5 days"
-    elif days in [6, 7]:
-        return "6-7 days"
-    elif days in [8, 9, 10]:
-        return "8-10 days"
-    else:
-        return "11+ days"
+def extreme_error_rows(df, n, largest=False):
+    """Rows with the n most negative (or most positive) errors, worst first"""
+    errors = df['error'].to_numpy()
+    key = -errors if largest else errors
+    n = min(n, np.count_nonzero(~np.isnan(key)))
+    if n == 0:
+        return df.iloc[:0]
+    # Partial selection finds the cut-off; every row up to it (ties included) is a candidate, and a
+    # stable sort of just those keeps case order among ties like nsmallest/nlargest(keep='first')
+    cutoff = np.partition(key, n - 1)[n - 1]
+    candidates = np.nonzero(key <= cutoff)[0]
+    return df.iloc[candidates[np.argsort(key[candidates], kind='stable')[:n]]]
 
-def categorize_mileage(miles_per_day):
-    """Categorize mileage efficiency"""
-    if miles_per_day < 50:
-        return "<50 mi/day"
-    elif miles_per_day < 100:
-        return "50-100 mi/day"
-    elif miles_per_day < 150:
-        return "100-150 mi/day"
-    elif miles_per_day < 200:
-        return "150-200 mi/day"
-    elif miles_per_day < 300:
-        return "200-300 mi/day"
-    else:
-        return "300+ mi/day"
+def bias_counts(errors):
+    """Under-, over- and exact prediction counts from one pass over the signed errors"""
+    # NaN errors count as none of the three, as with separate comparisons; infinite ones keep their sign
+    under, exact, over = np.bincount(np.sign(errors[~np.isnan(errors)]).astype(np.int64) + 1, minlength=3)
+    return under, over, exact
 
-def categorize_receipts(receipts_per_day):
-    """Categorize daily receipt spending"""
-    if receipts_per_day < 30:
-        return "Very Low (<$30/day)"
-    elif receipts_per_day < 75:
-        return "Low ($30-75/day)"
-    elif receipts_per_day < 150:
-        return "Medium ($75-150/day)"
-    elif receipts_per_day < 250:
-        return "High ($150-250/day)"
+def dense_scatter(ax, x, y, c=None, **kwargs):
+    """
+    Scatter plot that switches to a datashader raster for very large inputs.
+    The raster shows point counts per pixel, or the mean of c per pixel when c is given.
+    """
+    if len(x) < RASTERIZE_MIN_POINTS:
+        return ax.scatter(x, y, c=c, rasterized=True, **kwargs)
+    try:
+        import datashader as ds  # imported on demand; it is slow to load and unused for small inputs
+    except ImportError:  # datashader is optional; dense panels fall back to plain scatters
+        return ax.scatter(x, y, c=c, rasterized=True, **kwargs)
+    
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    x_range = (x.min(), x.max())
+    y_range = (y.min(), y.max())
+    canvas = ds.Canvas(plot_width=400, plot_height=400, x_range=x_range, y_range=y_range)
+    if c is None:
+        points = pd.DataFrame({'x': x, 'y': y})
+        image = canvas.points(points, 'x', 'y', agg=ds.count()).values.astype(np.float64)
+        image[image == 0] = np.nan
+        cmap = LinearSegmentedColormap.from_list('density', ['white', kwargs.get('color', 'C0')])
+        # Anchor below one point per pixel so the sparsest pixels still get a visible tint
+        norm = LogNorm(vmin=0.5, vmax=max(np.nanmax(image), 1.0))
     else:
-        return "Very High (>$250/day)"
-
-def categorize_total_receipts(total_receipts):
-    """Categorize total receipt amounts"""
-    if total_receipts < 50:
-        return "Very Low (<$50)"
-    elif total_receipts < 200:
-        return "Low ($50-200)"
-    elif total_receipts < 500:
-        return "Medium ($200-500)"
-    elif total_receipts < 1000:
-        return "High ($500-1000)"
-    else:
-        return "Very High (>$1000)"
+        points = pd.DataFrame({'x': x, 'y': y, 'c': np.asarray(c, dtype=np.float64)})
+        image = canvas.points(points, 'x', 'y', agg=ds.mean('c')).values
+        cmap = kwargs.get('cmap')
+        norm = None
+    return ax.imshow(np.ma.masked_invalid(image), extent=(*x_range, *y_range), origin='lower',
+                     aspect='auto', cmap=cmap, norm=norm, interpolation='nearest')
 
 def create_comprehensive_analysis(df):
     """Create comprehensive visualizations"""
     
     # Set up the plotting style
     plt.style.use('default')
-    sns.set_palette("husl")
     
     # Create a large figure with multiple subplots
     fig = plt.figure(figsize=(24, 20))
     
+    # Column arrays shared by the scatter panels, so each panel draws from NumPy views
+    expected = df['expected_output'].to_numpy()
+    predicted = df['predicted_output'].to_numpy()
+    # Range of the y = x reference line drawn on the expected-vs-predicted panels
+    emin, emax = expected.min(), expected.max()
+    
+    # Factorize each category column once; the boxplot, bar and scatter panels share these groupings
+    duration_groupby = df.groupby('duration_category', observed=True)
+    mileage_groupby = df.groupby('mileage_category', observed=True)
+    receipt_groupby = df.groupby('receipt_category', observed=True)
+    
     # 1. Overall Performance Metrics
     ax1 = plt.subplot(4, 4, 1)
-    correlation = np.corrcoef(df['expected_output'], df['predicted_output'])[0, 1]
+    correlation = np.corrcoef(expected, predicted)[0, 1]
     mae = df['abs_error'].mean()
-    ax1.scatter(df['expected_output'], df['predicted_output'], alpha=0.6, s=20)
-    ax1.plot([df['expected_output'].min(), df['expected_output'].max()], 
-             [df['expected_output'].min(), df['expected_output'].max()], 'r--', alpha=0.8)
+    dense_scatter(ax1, expected, predicted, alpha=0.6, s=20)
+    ax1.plot([emin, emax], [emin, emax], 'r--', alpha=0.8)
     ax1.set_xlabel('Expected Output ($)')
     ax1.set_ylabel('Predicted Output ($)')
     ax1.set_title(f'Overall Performance\nCorr: {correlation:.3f}, MAE: ${mae:.2f}')
@@ -132,7 +133,9 @@ def create_comprehensive_analysis(df):
     
     # 2. Error Distribution
     ax2 = plt.subplot(4, 4, 2)
-    ax2.hist(df['error'], bins=50, alpha=0.7, edgecolor='black')
+    # One filled step patch instead of a Rectangle per bin
+    counts, edges = np.histogram(df['error'], bins=50)
+    ax2.stairs(counts, edges, fill=True, alpha=0.7, edgecolor='black', linewidth=1)
     ax2.axvline(0, color='red', linestyle='--', alpha=0.8)
     ax2.set_xlabel('Error (Predicted - Expected) ($)')
     ax2.set_ylabel('Frequency')
@@ -141,9 +144,9 @@ def create_comprehensive_analysis(df):
     
     # 3. Error by Trip Duration
     ax3 = plt.subplot(4, 4, 3)
-    duration_groups = df.groupby('duration_category')['error'].apply(list)
-    duration_labels = list(duration_groups.index)
-    duration_data = list(duration_groups.values)
+    duration_groups = {label: errors.to_numpy() for label, errors in duration_groupby['error']}
+    duration_labels = list(duration_groups)
+    duration_data = list(duration_groups.values())
     bp = ax3.boxplot(duration_data, labels=duration_labels, patch_artist=True)
     for patch in bp['boxes']:
         patch.set_facecolor('lightblue')
@@ -156,9 +159,9 @@ def create_comprehensive_analysis(df):
     
     # 4. Error by Mileage Category
     ax4 = plt.subplot(4, 4, 4)
-    mileage_groups = df.groupby('mileage_category')['error'].apply(list)
-    mileage_labels = list(mileage_groups.index)
-    mileage_data = list(mileage_groups.values)
+    mileage_groups = {label: errors.to_numpy() for label, errors in mileage_groupby['error']}
+    mileage_labels = list(mileage_groups)
+    mileage_data = list(mileage_groups.values())
     bp = ax4.boxplot(mileage_data, labels=mileage_labels, patch_artist=True)
     for patch in bp['boxes']:
         patch.set_facecolor('lightgreen')
@@ -171,9 +174,9 @@ def create_comprehensive_analysis(df):
     
     # 5. Error by Receipt Category
     ax5 = plt.subplot(4, 4, 5)
-    receipt_groups = df.groupby('receipt_category')['error'].apply(list)
-    receipt_labels = list(receipt_groups.index)
-    receipt_data = list(receipt_groups.values)
+    receipt_groups = {label: errors.to_numpy() for label, errors in receipt_groupby['error']}
+    receipt_labels = list(receipt_groups)
+    receipt_data = list(receipt_groups.values())
     bp = ax5.boxplot(receipt_data, labels=receipt_labels, patch_artist=True)
     for patch in bp['boxes']:
         patch.set_facecolor('lightyellow')
@@ -186,10 +189,9 @@ def create_comprehensive_analysis(df):
     
     # 6. Absolute Error by Trip Duration
     ax6 = plt.subplot(4, 4, 6)
-    duration_summary = df.groupby('duration_category').agg({
-        'abs_error': ['mean', 'count']
-    }).round(2)
-    duration_summary.columns = ['Mean_MAE', 'Count']
+    duration_summary = duration_groupby.agg(
+        Mean_MAE=('abs_error', 'mean'), Count=('abs_error', 'size')
+    ).round(2)
     duration_summary = duration_summary.reset_index()
     
     bars = ax6.bar(duration_summary['duration_category'], duration_summary['Mean_MAE'], 
@@ -201,19 +203,14 @@ def create_comprehensive_analysis(df):
     ax6.grid(True, alpha=0.3)
     
     # Add count labels on bars
-    for bar, count in zip(bars, duration_summary['Count']):
-        height = bar.get_height()
-        ax6.text(bar.get_x() + bar.get_width()/2., height + 1,
-                f'n={count}', ha='center', va='bottom', fontsize=8)
+    ax6.bar_label(bars, labels=[f'n={count}' for count in duration_summary['Count']], fontsize=8, padding=3)
     
     # 7. Expected vs Predicted by Duration
     ax7 = plt.subplot(4, 4, 7)
-    for duration in df['duration_category'].unique():
-        subset = df[df['duration_category'] == duration]
-        ax7.scatter(subset['expected_output'], subset['predicted_output'], 
-                   label=duration, alpha=0.6, s=15)
-    ax7.plot([df['expected_output'].min(), df['expected_output'].max()], 
-             [df['expected_output'].min(), df['expected_output'].max()], 'r--', alpha=0.8)
+    # Draw groups in order of first appearance, as before, so the layering of the points is unchanged
+    for duration, idx in sorted(duration_groupby.indices.items(), key=lambda item: item[1][0]):
+        ax7.scatter(expected[idx], predicted[idx], label=duration, alpha=0.6, s=15, rasterized=True)
+    ax7.plot([emin, emax], [emin, emax], 'r--', alpha=0.8)
     ax7.set_xlabel('Expected Output ($)')
     ax7.set_ylabel('Predicted Output ($)')
     ax7.set_title('Performance by Trip Duration')
@@ -222,10 +219,8 @@ def create_comprehensive_analysis(df):
     
     # 8. Heatmap: Error by Duration vs Mileage
     ax8 = plt.subplot(4, 4, 8)
-    pivot_table = df.pivot_table(values='error', 
-                                index='duration_category', 
-                                columns='mileage_category', 
-                                aggfunc='mean')
+    import seaborn as sns  # only the heatmap uses seaborn
+    pivot_table = df.groupby(['duration_category', 'mileage_category'], observed=True)['error'].mean().unstack()
     sns.heatmap(pivot_table, annot=True, fmt='.1f', cmap='RdBu_r', center=0, 
                 ax=ax8, cbar_kws={'label': 'Mean Error ($)'})
     ax8.set_title('Mean Error Heatmap\n(Duration vs Mileage)')
@@ -234,8 +229,8 @@ def create_comprehensive_analysis(df):
     
     # 9. Receipt Amount vs Expected Output
     ax9 = plt.subplot(4, 4, 9)
-    scatter = ax9.scatter(df['total_receipts_amount'], df['expected_output'], 
-                         c=df['trip_duration_days'], cmap='viridis', alpha=0.6, s=20)
+    scatter = dense_scatter(ax9, df['total_receipts_amount'], df['expected_output'], 
+                            c=df['trip_duration_days'], cmap='viridis', alpha=0.6, s=20)
     ax9.set_xlabel('Total Receipt Amount ($)')
     ax9.set_ylabel('Expected Output ($)')
     ax9.set_title('Expected Output vs Receipt Amount')
@@ -244,8 +239,8 @@ def create_comprehensive_analysis(df):
     
     # 10. Miles vs Expected Output
     ax10 = plt.subplot(4, 4, 10)
-    scatter = ax10.scatter(df['miles_traveled'], df['expected_output'], 
-                          c=df['trip_duration_days'], cmap='plasma', alpha=0.6, s=20)
+    scatter = dense_scatter(ax10, df['miles_traveled'], df['expected_output'], 
+                            c=df['trip_duration_days'], cmap='plasma', alpha=0.6, s=20)
     ax10.set_xlabel('Miles Traveled')
     ax10.set_ylabel('Expected Output ($)')
     ax10.set_title('Expected Output vs Miles Traveled')
@@ -254,7 +249,7 @@ def create_comprehensive_analysis(df):
     
     # 11. Error vs Miles per Day
     ax11 = plt.subplot(4, 4, 11)
-    ax11.scatter(df['miles_per_day'], df['error'], alpha=0.6, s=20, color='orange')
+    dense_scatter(ax11, df['miles_per_day'], df['error'], alpha=0.6, s=20, color='orange')
     ax11.axhline(0, color='red', linestyle='--', alpha=0.8)
     ax11.set_xlabel('Miles per Day')
     ax11.set_ylabel('Error ($)')
@@ -263,7 +258,7 @@ def create_comprehensive_analysis(df):
     
     # 12. Error vs Receipts per Day
     ax12 = plt.subplot(4, 4, 12)
-    ax12.scatter(df['receipts_per_day'], df['error'], alpha=0.6, s=20, color='purple')
+    dense_scatter(ax12, df['receipts_per_day'], df['error'], alpha=0.6, s=20, color='purple')
     ax12.axhline(0, color='red', linestyle='--', alpha=0.8)
     ax12.set_xlabel('Receipts per Day ($)')
     ax12.set_ylabel('Error ($)')
@@ -272,10 +267,9 @@ def create_comprehensive_analysis(df):
     
     # 13. Performance by Total Receipt Category
     ax13 = plt.subplot(4, 4, 13)
-    receipt_summary = df.groupby('total_receipt_category').agg({
-        'abs_error': ['mean', 'count']
-    }).round(2)
-    receipt_summary.columns = ['Mean_MAE', 'Count']
+    receipt_summary = df.groupby('total_receipt_category', observed=True).agg(
+        Mean_MAE=('abs_error', 'mean'), Count=('abs_error', 'size')
+    ).round(2)
     receipt_summary = receipt_summary.reset_index()
     
     bars = ax13.bar(receipt_summary['total_receipt_category'], receipt_summary['Mean_MAE'], 
@@ -287,26 +281,29 @@ def create_comprehensive_analysis(df):
     ax13.grid(True, alpha=0.3)
     
     # Add count labels on bars
-    for bar, count in zip(bars, receipt_summary['Count']):
-        height = bar.get_height()
-        ax13.text(bar.get_x() + bar.get_width()/2., height + 1,
-                 f'n={count}', ha='center', va='bottom', fontsize=8)
-    
-    # 14. 3D Relationship Plot
-    ax14 = plt.subplot(4, 4, 14, projection='3d')
-    scatter = ax14.scatter(df['trip_duration_days'], df['miles_traveled'], df['total_receipts_amount'],
-                          c=df['expected_output'], cmap='coolwarm', alpha=0.6, s=20)
-    ax14.set_xlabel('Trip Duration (days)')
-    ax14.set_ylabel('Miles Traveled')
-    ax14.set_zlabel('Receipt Amount ($)')
-    ax14.set_title('3D Input Space\n(colored by expected output)')
+    ax13.bar_label(bars, labels=[f'n={count}' for count in receipt_summary['Count']], fontsize=8, padding=3)
+    
+    # 14. 3D Relationship Plot (mplot3d depth-sorts every point, so large inputs get a 2D hexbin instead)
+    if len(df) < RASTERIZE_MIN_POINTS:
+        ax14 = plt.subplot(4, 4, 14, projection='3d')
+        scatter = ax14.scatter(df['trip_duration_days'], df['miles_traveled'], df['total_receipts_amount'],
+                              c=df['expected_output'], cmap='coolwarm', alpha=0.6, s=20, rasterized=True)
+        ax14.set_xlabel('Trip Duration (days)')
+        ax14.set_ylabel('Miles Traveled')
+        ax14.set_zlabel('Receipt Amount ($)')
+        ax14.set_title('3D Input Space\n(colored by expected output)')
+    else:
+        ax14 = plt.subplot(4, 4, 14)
+        scatter = ax14.hexbin(df['trip_duration_days'], df['miles_traveled'], C=df['expected_output'],
+                              gridsize=30, reduce_C_function=np.mean, cmap='coolwarm')
+        ax14.set_xlabel('Trip Duration (days)')
+        ax14.set_ylabel('Miles Traveled')
+        ax14.set_title('Input Space\n(mean expected output per bin)')
     plt.colorbar(scatter, ax=ax14, label='Expected Output ($)', shrink=0.5)
     
     # 15. Bias Analysis
     ax15 = plt.subplot(4, 4, 15)
-    under_predictions = (df['error'] < 0).sum()
-    over_predictions = (df['error'] > 0).sum()
-    exact_predictions = (df['error'] == 0).sum()
+    under_predictions, over_predictions, exact_predictions = bias_counts(df['error'].to_numpy())
     
     labels = ['Under-predictions', 'Over-predictions', 'Exact']
     counts = [under_predictions, over_predictions, exact_predictions]
@@ -318,15 +315,14 @@ def create_comprehensive_analysis(df):
     # 16. Extreme Cases Analysis
     ax16 = plt.subplot(4, 4, 16)
     # Find top 10 worst cases in each direction
-    worst_under = df.nsmallest(10, 'error')
-    worst_over = df.nlargest(10, 'error')
+    worst_under = extreme_error_rows(df, 10)
+    worst_over = extreme_error_rows(df, 10, largest=True)
     
     ax16.scatter(worst_under['expected_output'], worst_under['predicted_output'], 
-                color='red', s=50, alpha=0.7, label='Worst Under-predictions')
+                color='red', s=50, alpha=0.7, label='Worst Under-predictions', rasterized=True)
     ax16.scatter(worst_over['expected_output'], worst_over['predicted_output'], 
-                color='blue', s=50, alpha=0.7, label='Worst Over-predictions')
-    ax16.plot([df['expected_output'].min(), df['expected_output'].max()], 
-             [df['expected_output'].min(), df['expected_output'].max()], 'black', alpha=0.8)
+                color='blue', s=50, alpha=0.7, label='Worst Over-predictions', rasterized=True)
+    ax16.plot([emin, emax], [emin, emax], 'black', alpha=0.8)
     ax16.set_xlabel('Expected Output ($)')
     ax16.set_ylabel('Predicted Output ($)')
     ax16.set_title('Extreme Error Cases')
@@ -356,9 +352,7 @@ def print_summary_statistics(df):
     print(f"   Correlation Coefficient: {correlation:.4f}")
     
     # Bias Analysis
-    under_predictions = (df['error'] < 0).sum()
-    over_predictions = (df['error'] > 0).sum()
-    exact_predictions = (df['error'] == 0).sum()
+    under_predictions, over_predictions, exact_predictions = bias_counts(df['error'].to_numpy())
     mean_bias = df['error'].mean()
     
     print(f"\n🎯 PREDICTION BIAS:")
@@ -368,10 +362,10 @@ def print_summary_statistics(df):
     print(f"   Mean Error (bias): ${mean_bias:.2f}")
     
     # Accuracy Brackets
-    within_25 = (df['abs_error'] <= 25).sum()
-    within_50 = (df['abs_error'] <= 50).sum()
-    within_100 = (df['abs_error'] <= 100).sum()
-    over_300 = (df['abs_error'] > 300).sum()
+    # All bracket counts from one sort of the absolute errors
+    within_25, within_50, within_100, within_300 = np.searchsorted(
+        np.sort(df['abs_error'].to_numpy()), [25, 50, 100, 300], side='right')
+    over_300 = len(df) - within_300
     
     print(f"\n📈 ACCURACY BRACKETS:")
     print(f"   Cases within ±$25: {within_25} ({within_25/len(df)*100:.1f}%)")
@@ -381,46 +375,40 @@ def print_summary_statistics(df):
     
     # Performance by Category
     print(f"\n🔍 PERFORMANCE BY TRIP DURATION:")
-    duration_stats = df.groupby('duration_category').agg({
-        'abs_error': ['mean', 'count'],
-        'error': 'mean'
-    }).round(2)
-    duration_stats.columns = ['MAE', 'Count', 'Mean_Error']
-    for idx, row in duration_stats.iterrows():
-        print(f"   {idx}: MAE=${row['MAE']:.2f}, Bias=${row['Mean_Error']:.2f} ({row['Count']} cases)")
+    duration_stats = df.groupby('duration_category', observed=True).agg(
+        MAE=('abs_error', 'mean'), Count=('abs_error', 'size'), Mean_Error=('error', 'mean')
+    ).round(2)
+    for row in duration_stats.itertuples():
+        print(f"   {row.Index}: MAE=${row.MAE:.2f}, Bias=${row.Mean_Error:.2f} ({row.Count} cases)")
     
     print(f"\n🛣️ PERFORMANCE BY MILEAGE EFFICIENCY:")
-    mileage_stats = df.groupby('mileage_category').agg({
-        'abs_error': ['mean', 'count'],
-        'error': 'mean'
-    }).round(2)
-    mileage_stats.columns = ['MAE', 'Count', 'Mean_Error']
-    for idx, row in mileage_stats.iterrows():
-        print(f"   {idx}: MAE=${row['MAE']:.2f}, Bias=${row['Mean_Error']:.2f} ({row['Count']} cases)")
+    mileage_stats = df.groupby('mileage_category', observed=True).agg(
+        MAE=('abs_error', 'mean'), Count=('abs_error', 'size'), Mean_Error=('error', 'mean')
+    ).round(2)
+    for row in mileage_stats.itertuples():
+        print(f"   {row.Index}: MAE=${row.MAE:.2f}, Bias=${row.Mean_Error:.2f} ({row.Count} cases)")
     
     print(f"\n💰 PERFORMANCE BY RECEIPT SPENDING:")
-    receipt_stats = df.groupby('receipt_category').agg({
-        'abs_error': ['mean', 'count'],
-        'error': 'mean'
-    }).round(2)
-    receipt_stats.columns = ['MAE', 'Count', 'Mean_Error']
-    for idx, row in receipt_stats.iterrows():
-        print(f"   {idx}: MAE=${row['MAE']:.2f}, Bias=${row['Mean_Error']:.2f} ({row['Count']} cases)")
+    receipt_stats = df.groupby('receipt_category', observed=True).agg(
+        MAE=('abs_error', 'mean'), Count=('abs_error', 'size'), Mean_Error=('error', 'mean')
+    ).round(2)
+    for row in receipt_stats.itertuples():
+        print(f"   {row.Index}: MAE=${row.MAE:.2f}, Bias=${row.Mean_Error:.2f} ({row.Count} cases)")
     
     # Extreme Cases
-    worst_under = df.nsmallest(3, 'error')
-    worst_over = df.nlargest(3, 'error')
+    worst_under = extreme_error_rows(df, 3)
+    worst_over = extreme_error_rows(df, 3, largest=True)
     
     print(f"\n🚨 WORST UNDER-PREDICTIONS:")
-    for idx, row in worst_under.iterrows():
-        print(f"   Expected: ${row['expected_output']:.2f}, Got: ${row['predicted_output']:.2f}, Error: ${row['error']:.2f}")
-        print(f"   Trip: {row['trip_duration_days']} days, {row['miles_traveled']} miles, ${row['total_receipts_amount']:.2f} receipts")
+    for row in worst_under.itertuples():
+        print(f"   Expected: ${row.expected_output:.2f}, Got: ${row.predicted_output:.2f}, Error: ${row.error:.2f}")
+        print(f"   Trip: {row.trip_duration_days} days, {row.miles_traveled} miles, ${row.total_receipts_amount:.2f} receipts")
         print()
     
     print(f"🚨 WORST OVER-PREDICTIONS:")
-    for idx, row in worst_over.iterrows():
-        print(f"   Expected: ${row['expected_output']:.2f}, Got: ${row['predicted_output']:.2f}, Error: ${row['error']:.2f}")
-        print(f"   Trip: {row['trip_duration_days']} days, {row['miles_traveled']} miles, ${row['total_receipts_amount']:.2f} receipts")
+    for row in worst_over.itertuples():
+        print(f"   Expected: ${row.expected_output:.2f}, Got: ${row.predicted_output:.2f}, Error: ${row.error:.2f}")
+        print(f"   Trip: {row.trip_duration_days} days, {row.miles_traveled} miles, ${row.total_receipts_amount:.2f} receipts")
         print()
 
 def main():
@@ -438,17 +426,17 @@ def main():
     fig = create_comprehensive_analysis(df)
     
     # Save the plot
-    plt.savefig('public_cases_comprehensive_analysis.png', dpi=300, bbox_inches='tight')
+    plt.savefig('public_cases_comprehensive_analysis.png', dpi=150, bbox_inches='tight')
     print("📊 Comprehensive analysis saved as 'public_cases_comprehensive_analysis.png'")
     
     # Save the processed data for further analysis
-    df.to_csv('public_cases_analysis.csv', index=False)
-    print("💾 Detailed data saved as 'public_cases_analysis.csv'")
+    df.to_parquet('public_cases_analysis.parquet', index=False, compression='zstd')
+    print("💾 Detailed data saved as 'public_cases_analysis.parquet'")
     
     print("\n✅ PUBLIC CASES ANALYSIS COMPLETE!")
     print("Generated files:")
     print("📈 public_cases_comprehensive_analysis.png - 16-panel comprehensive analysis")
-    print("📊 public_cases_analysis.csv - Detailed processed data with all metrics")
+    print("📊 public_cases_analysis.parquet - Detailed processed data with all metrics")
 
 if __name__ == "__main__":
     main()
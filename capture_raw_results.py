@@ -4,71 +4,78 @@ Capture raw results from legacy_evaluate function for all 1000 cases.
 Saves expected vs actual values to results.json for detailed analysis.
 """
 
-import json
-from legacy_calculate import calculate_legacy_reimbursement
+import numpy as np
+from case_cache import CASE_DTYPE, dump_json, load_json
+from legacy_calculate_vec import round_cents, calculate_legacy_reimbursement_vec
+
+# One column per results.json field, in output order; scores are stored already rounded to cents
+RESULT_DTYPE = np.dtype([('case_id', 'i8'), ('trip_duration_days', 'i8'), ('miles_traveled', 'f8'),
+                         ('total_receipts_amount', 'f8'), ('expected_output', 'f8'), ('actual_output', 'f8'),
+                         ('error', 'f8'), ('absolute_error', 'f8'), ('percentage_error', 'f8'),
+                         ('miles_per_day', 'f8'), ('receipts_per_day', 'f8'),
+                         ('under_predicted', '?'), ('over_predicted', '?')])
+# Inputs that public_cases.json writes as integers whenever the amount is whole
+WHOLE_NUMBER_COLUMNS = ['miles_traveled', 'total_receipts_amount', 'expected_output']
 
 def capture_raw_results():
     """
     Load all test cases and capture raw evaluation results.
-    Returns a list of dictionaries with case details and predictions.
+    Returns a structured array (RESULT_DTYPE) with case details and predictions.
     """
     print("Loading test cases...")
     
     # Load the test cases
-    with open('public_cases.json', 'r') as f:
-        test_cases = json.load(f)
+    test_cases = load_json('public_cases.json')
     
     print(f"Processing {len(test_cases)} test cases...")
     
-    raw_results = []
-    
-    for i, case in enumerate(test_cases):
-        # Extract case parameters
-        trip_duration = case['input']['trip_duration_days']
-        miles_traveled = case['input']['miles_traveled']
-        receipts_amount = case['input']['total_receipts_amount']
-        expected_output = case['expected_output']
-        
-        # Calculate actual output using legacy algorithm
-        actual_output = calculate_legacy_reimbursement(
-            trip_duration, 
-            miles_traveled, 
-            receipts_amount
-        )
-        
-        # Calculate error metrics
-        error = actual_output - expected_output
-        absolute_error = abs(error)
-        percentage_error = (error / expected_output * 100) if expected_output != 0 else 0
-        
-        # Calculate derived metrics for analysis
-        miles_per_day = miles_traveled / trip_duration if trip_duration > 0 else 0
-        receipts_per_day = receipts_amount / trip_duration if trip_duration > 0 else 0
-        
-        # Store comprehensive result
-        result = {
-            'case_id': i + 1,
-            'trip_duration_days': trip_duration,
-            'miles_traveled': miles_traveled,
-            'total_receipts_amount': receipts_amount,
-            'expected_output': expected_output,
-            'actual_output': round(actual_output, 2),
-            'error': round(error, 2),
-            'absolute_error': round(absolute_error, 2),
-            'percentage_error': round(percentage_error, 2),
-            'miles_per_day': round(miles_per_day, 2),
-            'receipts_per_day': round(receipts_per_day, 2),
-            'under_predicted': error < 0,
-            'over_predicted': error > 0
-        }
-        
-        raw_results.append(result)
-        
-        # Progress indicator
-        if (i + 1) % 100 == 0:
-            print(f"Processed {i + 1} cases...")
-    
-    return raw_results
+    # Typed input columns, so the whole batch is priced and scored in array passes
+    cases = np.fromiter(((case['input']['trip_duration_days'],
+                          case['input']['miles_traveled'],
+                          case['input']['total_receipts_amount'],
+                          case['expected_output'])
+                         for case in test_cases), dtype=CASE_DTYPE)
+    days = cases['trip_duration_days']
+    miles = cases['miles_traveled']
+    receipts = cases['total_receipts_amount']
+    expected = cases['expected_output']
+    
+    results = np.empty(len(cases), dtype=RESULT_DTYPE)
+    results['case_id'] = np.arange(1, len(cases) + 1)
+    for name in CASE_DTYPE.names:
+        results[name] = cases[name]
+    
+    # Calculate actual output using legacy algorithm
+    actual = calculate_legacy_reimbursement_vec(days, miles, receipts)
+    results['actual_output'] = actual
+    
+    # Calculate error metrics
+    error = actual - expected
+    results['error'] = round_cents(error)
+    results['absolute_error'] = round_cents(np.abs(error))
+    results['percentage_error'] = round_cents(
+        np.divide(error * 100, expected, out=np.zeros(len(cases)), where=expected != 0))
+    results['under_predicted'] = error < 0
+    results['over_predicted'] = error > 0
+    
+    # Calculate derived metrics for analysis
+    has_days = days > 0
+    results['miles_per_day'] = round_cents(np.divide(miles, days, out=np.zeros(len(cases)), where=has_days))
+    results['receipts_per_day'] = round_cents(np.divide(receipts, days, out=np.zeros(len(cases)), where=has_days))
+    
+    print(f"Processed {len(results)} cases...")
+    
+    return results
+
+def result_records(results):
+    """
+    Convert the result columns to the per-case dictionaries stored in results.json.
+    """
+    columns = {name: results[name].tolist() for name in RESULT_DTYPE.names}
+    # Whole amounts go back to ints so the records match the case file value for value
+    for name in WHOLE_NUMBER_COLUMNS:
+        columns[name] = [int(value) if value.is_integer() else value for value in columns[name]]
+    return [dict(zip(RESULT_DTYPE.names, row)) for row in zip(*columns.values())]
 
 def save_results_to_json(results, filename='results.json'):
     """
@@ -78,25 +85,13 @@ def save_results_to_json(results, filename='results.json'):
     
     # Create summary statistics
     total_cases = len(results)
-    under_predicted_cases = sum(1 for r in results if r['under_predicted'])
-    over_predicted_cases = sum(1 for r in results if r['over_predicted'])
-    mean_absolute_error = sum(r['absolute_error'] for r in results) / total_cases
-    total_error = sum(r['error'] for r in results)
+    under_predicted_cases = int(np.count_nonzero(results['under_predicted']))
+    over_predicted_cases = int(np.count_nonzero(results['over_predicted']))
+    mean_absolute_error = float(results['absolute_error'].mean())
+    total_error = float(results['error'].sum())
     
     # Calculate correlation coefficient
-    expected_values = [r['expected_output'] for r in results]
-    actual_values = [r['actual_output'] for r in results]
-    
-    # Simple correlation calculation
-    n = len(expected_values)
-    sum_expected = sum(expected_values)
-    sum_actual = sum(actual_values)
-    sum_exp_sq = sum(x**2 for x in expected_values)
-    sum_act_sq = sum(x**2 for x in actual_values)
-    sum_exp_act = sum(expected_values[i] * actual_values[i] for i in range(n))
-    
-    correlation = ((n * sum_exp_act - sum_expected * sum_actual) / 
-                  ((n * sum_exp_sq - sum_expected**2) * (n * sum_act_sq - sum_actual**2))**0.5)
+    correlation = float(np.corrcoef(results['expected_output'], results['actual_output'])[0, 1])
     
     # Prepare output data
     output_data = {
@@ -115,12 +110,11 @@ def save_results_to_json(results, filename='results.json'):
             'under_prediction_rate': round(under_predicted_cases / total_cases * 100, 1),
             'over_prediction_rate': round(over_predicted_cases / total_cases * 100, 1)
         },
-        'raw_results': results
+        'raw_results': result_records(results)
     }
     
     # Save to JSON file
-    with open(filename, 'w') as f:
-        json.dump(output_data, f, indent=2)
+    dump_json(output_data, filename)
     
     print(f"Results saved to {filename}")
     print(f"Summary:")
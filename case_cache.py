@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Columnar cache of the public test cases.
+Parses public_cases.json once into a typed DataFrame and stores it as Parquet; later loads read
+the Parquet file directly unless the JSON is newer than the cache.
+Usage: python3 case_cache.py  (rebuilds public_cases.parquet)
+"""
+
+import json
+import os
+import numpy as np
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; the stdlib parser gives identical results
+    orjson = None
+
+try:
+    import ijson
+except ImportError:  # ijson is optional; without it cases are parsed in one piece
+    ijson = None
+
+CASES_PATH = 'public_cases.json'
+CACHE_PATH = 'public_cases.parquet'
+CASE_COLUMNS = ['trip_duration_days', 'miles_traveled', 'total_receipts_amount', 'expected_output']
+DERIVED_COLUMNS = ['miles_per_day', 'receipts_per_day']
+CASE_DTYPE = np.dtype([('trip_duration_days', 'i8'), ('miles_traveled', 'f8'),
+                       ('total_receipts_amount', 'f8'), ('expected_output', 'f8')])
+
+def load_json(path):
+    """Parse a JSON file, using orjson when it is installed."""
+    if orjson is not None:
+        with open(path, 'rb') as f:
+            return orjson.loads(f.read())
+    with open(path, 'r') as f:
+        return json.load(f)
+
+def dump_json(obj, path):
+    """Write obj as 2-space indented JSON, using orjson when it is installed."""
+    if orjson is not None:
+        # Same bytes as json.dump(indent=2) for the ASCII, finite data the scripts write
+        with open(path, 'wb') as f:
+            f.write(orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY))
+        return
+    with open(path, 'w') as f:
+        json.dump(obj, f, indent=2)
+
+def iter_cases(cases_path=CASES_PATH):
+    """Yield test cases one at a time, streaming them with ijson when it is installed."""
+    if ijson is None:
+        yield from load_json(cases_path)
+        return
+    with open(cases_path, 'rb') as f:
+        yield from ijson.items(f, 'item', use_float=True)
+
+def build_cache(cases_path=CASES_PATH, cache_path=CACHE_PATH):
+    """Parse the JSON test cases and write them to the Parquet cache."""
+    import pandas as pd  # imported here so the JSON helpers stay light for scripts that only need them
+    # Fill typed columns straight from the case stream, with no intermediate row objects
+    records = np.fromiter(((case['input']['trip_duration_days'],
+                            case['input']['miles_traveled'],
+                            case['input']['total_receipts_amount'],
+                            case['expected_output'])
+                           for case in iter_cases(cases_path)), dtype=CASE_DTYPE)
+    df = pd.DataFrame({col: records[col] for col in CASE_COLUMNS})
+
+    # Per-day rates are stored as columns so consumers filter on them without recomputing
+    days = records['trip_duration_days']
+    df['miles_per_day'] = np.divide(records['miles_traveled'], days, out=np.zeros(len(days)), where=days > 0)
+    df['receipts_per_day'] = np.divide(records['total_receipts_amount'], days, out=np.zeros(len(days)), where=days > 0)
+
+    df.to_parquet(cache_path, index=False)
+    return df
+
+def load_public_cases_df(cases_path=CASES_PATH, cache_path=CACHE_PATH):
+    """Load the test cases as a DataFrame, rebuilding the cache if it is missing or stale."""
+    import pandas as pd
+    if os.path.exists(cache_path) and os.path.getmtime(cache_path) >= os.path.getmtime(cases_path):
+        df = pd.read_parquet(cache_path)
+        if all(col in df.columns for col in CASE_COLUMNS + DERIVED_COLUMNS):
+            return df
+    return build_cache(cases_path, cache_path)
+
+if __name__ == '__main__':
+    df = build_cache()
+    print(f"Cached {len(df)} cases to {CACHE_PATH}")
@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Check that calculate_legacy_reimbursement_vec still matches the scalar legacy rules.
+Prices the public and private cases plus a grid of fractional, boundary and non-finite trip
+lengths both ways and reports every case where the two results differ.
+Usage: python3 check_vectorized.py  (exits 1 on any mismatch)
+"""
+
+import itertools
+import sys
+import numpy as np
+from case_cache import load_json
+from legacy_calculate import calculate_legacy_reimbursement
+from legacy_calculate_vec import calculate_legacy_reimbursement_vec
+
+# Whole lengths around every tier edge, fractional lengths between them, and the degenerate ones
+EDGE_DAYS = [-2.5, -1, 0, 0.5, 1, 1.5, 2, 2.5, 3, 3.5, 4, 4.5, 5, 5.5, 6, 6.5, 7, 7.5, 8, 8.5,
+             9, 9.5, 10, 11, 11.5, 13.9, 14, 14.5, 15, 15.5, 16, 30, float('inf'), float('nan')]
+EDGE_MILES = [0, 30, 100, 300, 400.5, 500, 650, 800, 900, 1000, 1200]
+EDGE_RECEIPTS = [0, 12.49, 20, 50, 300, 600, 800, 1000, 1200.99, 2000, 2500]
+
+def case_inputs():
+    """(source, days, miles, receipts) columns for every case to check."""
+    public = load_json('public_cases.json')
+    yield 'public', [[case['input'][name] for case in public]
+                     for name in ('trip_duration_days', 'miles_traveled', 'total_receipts_amount')]
+    private = load_json('private_cases.json')
+    yield 'private', [[case[name] for case in private]
+                      for name in ('trip_duration_days', 'miles_traveled', 'total_receipts_amount')]
+    yield 'edge', [list(column) for column in zip(*itertools.product(EDGE_DAYS, EDGE_MILES, EDGE_RECEIPTS))]
+
+def find_mismatches(days, miles, receipts):
+    """Cases where the scalar and vectorized results differ (NaN matches NaN)."""
+    scalar = np.array([calculate_legacy_reimbursement(d, m, r) for d, m, r in zip(days, miles, receipts)])
+    vectorized = calculate_legacy_reimbursement_vec(np.array(days), np.array(miles), np.array(receipts))
+    differ = ~((scalar == vectorized) | (np.isnan(scalar) & np.isnan(vectorized)))
+    return [(days[i], miles[i], receipts[i], scalar[i], vectorized[i]) for i in np.nonzero(differ)[0]]
+
+def main():
+    failed = False
+    for source, (days, miles, receipts) in case_inputs():
+        mismatches = find_mismatches(days, miles, receipts)
+        print(f"{source}: {len(days)} cases, {len(mismatches)} mismatches")
+        for case in mismatches[:10]:
+            print("  days={} miles={} receipts={}: scalar {} vs vectorized {}".format(*case))
+        failed = failed or bool(mismatches)
+    sys.exit(1 if failed else 0)
+
+if __name__ == '__main__':
+    main()
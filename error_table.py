@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Shared table of legacy predictions and errors for the public test cases.
+Importing this module exposes DF: the public cases plus predicted_output, error (predicted - expected),
+abs_error and over_under columns. The table is persisted to error_table.parquet together with a
+hash of the test cases, the case loader, this module and the legacy rule sources, and recomputed
+only when that content changes.
+"""
+
+import hashlib
+import os
+import numpy as np
+import pandas as pd
+from case_cache import CASES_PATH, build_cache
+from legacy_calculate_vec import calculate_legacy_reimbursement_vec
+
+TABLE_PATH = 'error_table.parquet'
+OVER_UNDER_LABELS = ['under', 'exact', 'over']
+_MODULE_DIR = os.path.dirname(os.path.abspath(__file__))
+RULE_SOURCES = [os.path.join(_MODULE_DIR, name) for name in ('case_cache.py', 'error_table.py',
+                                                               'legacy_calculate.py', 'legacy_calculate_vec.py')]
+
+def source_hash():
+    """Digest of the test cases and the sources (loader, this module, legacy rules) the table is derived from."""
+    digest = hashlib.blake2b(digest_size=16)
+    for path in [CASES_PATH] + RULE_SOURCES:
+        with open(path, 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+def build_error_table(table_path=TABLE_PATH):
+    """Run the vectorized legacy calculation over every public case and persist the result."""
+    # Hash first, then parse the JSON itself instead of the mtime-keyed case cache, so the stored
+    # hash always describes the rows it is stored with
+    digest = source_hash()
+    df = build_cache()
+
+    df['predicted_output'] = calculate_legacy_reimbursement_vec(
+        df['trip_duration_days'].to_numpy(),
+        df['miles_traveled'].to_numpy(),
+        df['total_receipts_amount'].to_numpy()
+    )
+    df['error'] = df['predicted_output'] - df['expected_output']
+    df['abs_error'] = df['error'].abs()
+    # Categorical built straight from the error signs: one int8 code per case instead of a string object
+    # (a NaN error counts as neither over nor under, as the string labels had it)
+    error_sign = np.sign(np.nan_to_num(df['error'].to_numpy(), nan=0.0))
+    df['over_under'] = pd.Categorical.from_codes(error_sign.astype(np.int8) + 1, categories=OVER_UNDER_LABELS)
+
+    df.attrs['source_hash'] = digest
+    df.to_parquet(table_path, index=False)
+    return df
+
+def load_error_table(table_path=TABLE_PATH):
+    """Load the error table, rebuilding it if the cases or the legacy rules changed."""
+    # Keyed on content rather than mtimes, so checkouts and copies of unchanged files reuse the table
+    if os.path.exists(table_path):
+        df = pd.read_parquet(table_path)
+        if df.attrs.get('source_hash') == source_hash():
+            return df
+    return build_error_table(table_path)
+
+DF = load_error_table()
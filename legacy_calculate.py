@@ -1,5 +1,12 @@
-import math
-from datetime import datetime
+# Trip duration modifiers, indexed by whole trip length clipped to 0..15 (index 15 stands for every trip over 14 days)
+TRIP_LENGTH_MULTIPLIER = (
+    0.92, 0.92,  # Single day trips: limited efficiency bonus
+    0.98, 0.98,  # 2-3 days: short trips get reduced efficiency bonuses
+    1.02,        # 4 days: optimal business trip range
+    1.05,        # 5 days: sweet spot bonus
+    1.02,        # 6 days: optimal business trip range
+    0.92,        # 7 days: no duration bonus
+) + (0.95,) * 7 + (0.90,)  # Long trips get capped efficiency bonuses, further reduced past 14 days
 
 def calculate_legacy_reimbursement(trip_duration_days, miles_traveled, total_receipts_amount):
     """
@@ -18,10 +25,17 @@ def calculate_legacy_reimbursement(trip_duration_days, miles_traveled, total_rec
                 # 4-day trips with extreme receipts - SYSTEMATIC FIX
                 # Pattern analysis: 97% under-predicted by avg $381
                 total_reimbursement *= 0.95  # Increased from 0.8"""
+    return round(unrounded_legacy_reimbursement(trip_duration_days, miles_traveled, total_receipts_amount), 2)
+
+def unrounded_legacy_reimbursement(trip_duration_days, miles_traveled, total_receipts_amount):
+    """Legacy rule tree before the final rounding to cents (shared with the batch calculators)."""
     
-    # Base calculations
-    miles_per_day = miles_traveled / trip_duration_days if trip_duration_days > 0 else 0
-    receipts_per_day = total_receipts_amount / trip_duration_days if trip_duration_days > 0 else 0
+    # Base calculations (one trip-length check covers both rates)
+    if trip_duration_days > 0:
+        miles_per_day = miles_traveled / trip_duration_days
+        receipts_per_day = total_receipts_amount / trip_duration_days
+    else:
+        miles_per_day = receipts_per_day = 0
     
     # === MILEAGE CALCULATION (Tiered) ===
     # Lisa: "First 100 miles or so, you get the full rate—like 58 cents per mile. After that, it drops"
@@ -90,23 +104,15 @@ def calculate_legacy_reimbursement(trip_duration_days, miles_traveled, total_rec
     else:  # miles_per_day < 50
         base_efficiency = 1.0   # No penalty for low efficiency
     
-    # Then apply trip duration modifier (instead of separate length_multiplier)
-    if trip_duration_days == 5:
-        # 5-day sweet spot bonus
-        trip_efficiency_multiplier = base_efficiency * 1.05  # Combine efficiency with 5-day bonus
-    elif trip_duration_days in [4, 6]:
-        # Optimal business trip range  
-        trip_efficiency_multiplier = base_efficiency * 1.02  # Small bonus for good duration
-    elif trip_duration_days in [2, 3]:
-        # Short trips get reduced efficiency bonuses
-        trip_efficiency_multiplier = base_efficiency * 0.98  # Slight penalty for very short
+    # Then apply trip duration modifier (instead of separate length_multiplier), one table lookup
+    # for whole trip lengths; fractional, NaN and out-of-range lengths keep the open-ended checks
+    if 0 <= trip_duration_days <= 15 and trip_duration_days == int(trip_duration_days):
+        trip_efficiency_multiplier = base_efficiency * TRIP_LENGTH_MULTIPLIER[int(trip_duration_days)]
+    elif trip_duration_days > 14:
+        trip_efficiency_multiplier = base_efficiency * 0.90  # Further reduce for very long trips
     elif trip_duration_days > 7:
-        # Long trips get capped efficiency bonuses
-        if trip_duration_days <= 14:
-            trip_efficiency_multiplier = base_efficiency * 0.95  # Reduce efficiency bonus for long trips
-        else:
-            trip_efficiency_multiplier = base_efficiency * 0.90  # Further reduce for very long trips
-    else:  # Single day trips
+        trip_efficiency_multiplier = base_efficiency * 0.95  # Reduce efficiency bonus for long trips
+    else:
         trip_efficiency_multiplier = base_efficiency * 0.92  # Single-day gets limited efficiency bonus
     
     # CORE ADJUSTMENT 2: SPENDING REASONABLENESS
@@ -124,6 +130,8 @@ def calculate_legacy_reimbursement(trip_duration_days, miles_traveled, total_rec
     # === ROUNDING BUG BONUS ===
     # Lisa: "If your receipts end in 49 or 99 cents, you often get a little extra money"
     rounding_bonus = 0
+    # Truncated, not rounded, on purpose: the float product can land just under the cent
+    # (2321.49 * 100 gives ...48.99), and the saved predictions are built on that behaviour
     cents = int((total_receipts_amount * 100) % 100)
     if cents in [49, 99]:
         rounding_bonus = 5   # Reduced from 10 to fix over-prediction bias
@@ -317,7 +325,7 @@ def calculate_legacy_reimbursement(trip_duration_days, miles_traveled, total_rec
     minimum_reimbursement = trip_duration_days * 50  # At least $50/day
     total_reimbursement = max(total_reimbursement, minimum_reimbursement)
     
-    return round(total_reimbursement, 2)
+    return total_reimbursement
 
 # === TEST CASES BASED ON INTERVIEW EXAMPLES ===
 if __name__ == "__main__":
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+Vectorized legacy reimbursement calculation.
+Array form of legacy_calculate.calculate_legacy_reimbursement: every branch of the rule tree
+is evaluated with np.select/np.where over whole input columns, so a batch of cases is priced
+in a handful of NumPy passes instead of one Python call per case.
+Results match the scalar function case for case; keep the two in sync when rules change.
+"""
+
+import numpy as np
+from legacy_calculate import TRIP_LENGTH_MULTIPLIER
+
+# Lookups indexed by whole trip lengths clipped to 0..15 (index 15 stands for every trip over 14 days),
+# replacing the equality ladders on days; fractional lengths match none of those equalities
+_TRIP_LENGTH_MULTIPLIER = np.array(TRIP_LENGTH_MULTIPLIER)
+# Duration tier: 0 none, 1 short (2-3 days), 2 mid (4-5), 3 six days, 4 seven days, 5 long (8+)
+_DURATION_TIER = np.array([0, 0, 1, 1, 2, 2, 3, 4] + [5] * 8)
+
+# Receipt rates below $50, from $50 to $600, and above $600 up to $800
+_FLAT_RECEIPT_RATES = np.array([0.40, 0.75, 0.85])
+
+def round_cents(values):
+    """
+    Round like the scalar path: np.round scales by 100 first and can land a cent off
+    Python's correctly rounded round(), but only when the scaled value sits next to a
+    half cent. Those values (and non-finite or huge ones) go through round() one by one.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    shape = values.shape
+    values = values.ravel()
+    scaled = values * 100
+    whole_cents = np.rint(scaled)
+    rounded = whole_cents / 100
+    with np.errstate(invalid='ignore'):
+        ambiguous = ~((np.abs(np.abs(scaled - whole_cents) - 0.5) > 1e-6) & (np.abs(scaled) < 2 ** 33))
+    if ambiguous.any():
+        rounded[ambiguous] = [round(value, 2) for value in values[ambiguous].tolist()]
+    return rounded.reshape(shape)
+
+def calculate_legacy_reimbursement_vec(trip_duration_days, miles_traveled, total_receipts_amount):
+    """
+    Calculate legacy reimbursements for arrays of trips.
+    Returns a float64 ndarray rounded to 2 decimal places.
+    """
+    days = np.asarray(trip_duration_days)
+    miles = np.asarray(miles_traveled, dtype=np.float64)
+    receipts = np.asarray(total_receipts_amount, dtype=np.float64)
+
+    # Base calculations
+    # Per-day rates stay 0 for non-positive trip lengths; the masked divide needs no clamped denominator
+    has_days = days > 0
+    miles_per_day = np.divide(miles, days, out=np.zeros(np.broadcast(miles, days).shape), where=has_days)
+    receipts_per_day = np.divide(receipts, days, out=np.zeros(np.broadcast(receipts, days).shape), where=has_days)
+
+    # === MILEAGE CALCULATION (Tiered) ===
+    # Each tier pays its rate on the miles that fall inside it; the sums add in the same order as the
+    # scalar formulas, so results are bit-identical without selecting a branch per case
+    mileage_reimbursement = (np.minimum(miles, 100) * 0.58
+                             + np.clip(miles - 100, 0, 400) * 0.40
+                             + np.maximum(miles - 500, 0) * 0.25)
+    mileage_reimbursement = np.where(miles_per_day < 50,
+                                     mileage_reimbursement + days * 10,
+                                     mileage_reimbursement)
+
+    # === PER DIEM BASE ===
+    base_per_diem = days * 90
+
+    # === RECEIPT PROCESSING (Non-linear) ===
+    # Up to $800 one flat rate applies to the whole amount; above it the tiers are marginal
+    flat_receipt_rate = _FLAT_RECEIPT_RATES[(receipts >= 50).astype(np.intp) + (receipts > 600)]
+    receipt_reimbursement = np.where(
+        receipts <= 800,
+        receipts * flat_receipt_rate,
+        (800 * 0.85
+         + np.clip(receipts - 800, 0, 400) * 0.60
+         + np.clip(receipts - 1200, 0, 800) * 0.30
+         + np.maximum(receipts - 2000, 0) * 0.10))
+
+    # CORE ADJUSTMENT 1: TRIP EFFICIENCY
+    base_efficiency = np.select(
+        [(miles_per_day >= 180) & (miles_per_day <= 220),
+         (miles_per_day >= 120) & (miles_per_day < 180),
+         (miles_per_day >= 50) & (miles_per_day < 120),
+         (miles_per_day >= 200) & (miles_per_day < 250),
+         miles_per_day > 300],
+        [1.10, 1.02, 1.08, 1.01, 0.95],
+        1.0)
+    whole_days = days == np.floor(days)
+    trip_length = np.where(whole_days, np.clip(days, 0, 15), 0).astype(np.intp)
+    # Fractional (and NaN) lengths skip the table, taking the scalar rules' open-ended checks
+    trip_efficiency_multiplier = base_efficiency * np.where(
+        whole_days, _TRIP_LENGTH_MULTIPLIER[trip_length], np.select([days > 14, days > 7], [0.90, 0.95], 0.92))
+
+    # CORE ADJUSTMENT 2: SPENDING REASONABLENESS
+    spending_reasonableness_multiplier = np.select(
+        [receipts_per_day > 200, receipts_per_day > 150, receipts_per_day < 30],
+        [0.88, 0.92, 0.96],
+        1.0)
+
+    # === ROUNDING BUG BONUS ===
+    cents = np.trunc(np.mod(receipts * 100, 100))
+    rounding_bonus = np.where((cents == 49) | (cents == 99), 5, 0)
+
+    # === FINAL CALCULATION ===
+    lodging_reimbursement = np.maximum(base_per_diem, receipt_reimbursement)
+    base_reimbursement = mileage_reimbursement + lodging_reimbursement
+    total_reimbursement = (base_reimbursement * trip_efficiency_multiplier *
+                           spending_reasonableness_multiplier) + rounding_bonus
+
+    # === MILEAGE BONUSES ===
+    single_day_mileage_bonus = np.select([miles > 800, miles > 600], [45, 25], 0)
+    multi_day_mileage_bonus = np.select([miles > 1000, miles > 800, miles > 600, miles > 400],
+                                        [230, 150, 85, 40], 0)
+    total_reimbursement = total_reimbursement + np.where(days == 1, single_day_mileage_bonus,
+                                                         multi_day_mileage_bonus)
+
+    # Weekend penalty for 6-7 day trips
+    total_reimbursement = total_reimbursement * np.where((days == 6) | (days == 7), 0.96, 1.0)
+
+    # === SWEET SPOT COMBO BONUS ===
+    six_to_eight = (days >= 6) & (days <= 8)
+    total_reimbursement = total_reimbursement * np.select(
+        [six_to_eight & (miles > 800) & (receipts_per_day < 200) & (miles > 1000),
+         six_to_eight & (miles > 800) & (receipts_per_day < 200),
+         six_to_eight & (miles > 600)],
+        [1.35, 1.25, 1.15],
+        1.0)
+
+    # === TRIP DURATION TIER SYSTEM ===
+    single_day_bonus = np.select(
+        [receipts >= 1000, receipts >= 300, receipts >= 100, miles > 800],
+        [1000, 500, 300, 400],
+        200)
+
+    short_trip_factor = np.select([receipts_per_day > 400, receipts_per_day > 200], [1.2, 1.15], 1.1)
+
+    mid_trip_factor = np.select(
+        [(receipts_per_day > 450) & (days == 5),
+         receipts_per_day > 450,
+         (receipts_per_day > 300) & (days == 4),
+         receipts_per_day > 300,
+         (days == 5) & (receipts_per_day < 50),
+         days == 5],
+        [1.1, 1.2, 1.15, 1.1, 0.9, 1.1],
+        1.05)
+
+    six_day_factor = np.select(
+        [receipts_per_day < 50, receipts_per_day >= 300, receipts_per_day >= 150],
+        [1.0, 1.15, 1.25],
+        1.2)
+
+    seven_day_factor = np.select(
+        [receipts_per_day >= 200, receipts_per_day >= 100, receipts_per_day < 50],
+        [1.35, 1.25, 1.0],
+        1.2)
+
+    long_trip_factor = np.select(
+        [(days >= 14) & (receipts_per_day >= 150),
+         (days >= 14) & (receipts_per_day < 75),
+         days >= 14,
+         (days >= 11) & (receipts_per_day >= 150),
+         (days >= 11) & (receipts_per_day >= 100),
+         days >= 11,
+         (days >= 9) & (receipts_per_day >= 150),
+         (days >= 9) & (receipts_per_day >= 100),
+         days >= 9,
+         receipts_per_day >= 150,
+         receipts_per_day >= 100,
+         receipts_per_day < 75],
+        [1.25, 1.15, 1.2, 1.3, 1.25, 1.15, 1.2, 1.25, 1.1, 1.15, 1.2, 0.95],
+        1.1)
+
+    duration_tier = np.where(whole_days, _DURATION_TIER[trip_length], np.where(days >= 8, 5, 0))
+    duration_factor = np.choose(duration_tier,
+                                [1.0, short_trip_factor, mid_trip_factor, six_day_factor, seven_day_factor,
+                                 long_trip_factor])
+    total_reimbursement = total_reimbursement * duration_factor
+
+    # General long-trip adjustments, applied as separate steps like the scalar rules
+    long_trip = days >= 8
+    total_reimbursement = total_reimbursement * np.where(long_trip & (receipts_per_day < 50), 0.75, 1.0)
+    total_reimbursement = total_reimbursement * np.where(
+        long_trip & (days <= 11) & (miles > 800) & (receipts_per_day >= 50), 1.05, 1.0)
+
+    total_reimbursement = np.where(days == 1, mileage_reimbursement + single_day_bonus,
+                                   total_reimbursement)
+
+    # Ensure minimum reimbursement
+    total_reimbursement = np.maximum(total_reimbursement, days * 50)
+
+    return round_cents(total_reimbursement)
@@ -1,46 +1,39 @@
-import json
-from legacy_calculate import calculate_legacy_reimbursement
+import numpy as np
 
-# Load public test cases
-with open('public_cases.json', 'r') as f:
-    test_cases = json.load(f)
+def quick_eval(df):
+    """Print headline accuracy and the worst high-error cases for a predictions table."""
+    days = df['trip_duration_days'].to_numpy()
+    miles = df['miles_traveled'].to_numpy()
+    receipts = df['total_receipts_amount'].to_numpy()
+    expected = df['expected_output'].to_numpy()
+    predicted = df['predicted_output'].to_numpy()
+    errors = df['abs_error'].to_numpy()
 
-errors = []
-exact_matches = 0
-high_error_cases = []
+    exact_matches = np.count_nonzero(errors == 0)
+    high_error_idx = np.nonzero(errors > 500)[0]
 
-for i, case in enumerate(test_cases):
-    predicted = calculate_legacy_reimbursement(
-        case['input']['trip_duration_days'],
-        case['input']['miles_traveled'], 
-        case['input']['total_receipts_amount']
-    )
-    actual = case['expected_output']
-    error = abs(predicted - actual)
-    errors.append(error)
-    
-    if error == 0:
-        exact_matches += 1
-    elif error > 500:
-        high_error_cases.append({
-            'case': i, 
-            'inputs': case['input'],
-            'predicted': predicted,
-            'actual': actual, 
-            'error': error
-        })
+    avg_error = errors.mean()
+    print('Average Error: ${:.2f}'.format(avg_error))
+    print('Exact Matches: {}/{} ({:.1f}%)'.format(exact_matches, len(df), exact_matches/len(df)*100))
+    print('High Error Cases (>$500): {}'.format(len(high_error_idx)))
 
-avg_error = sum(errors) / len(errors)
-print('Average Error: ${:.2f}'.format(avg_error))
-print('Exact Matches: {}/{} ({:.1f}%)'.format(exact_matches, len(test_cases), exact_matches/len(test_cases)*100))
-print('High Error Cases (>$500): {}'.format(len(high_error_cases)))
+    # Show a few high error cases
+    print()
+    print('Top high-error cases:')
+    # Stable sort of just the high-error cases, so tied errors keep case order
+    top_idx = high_error_idx[np.argsort(-errors[high_error_idx], kind='stable')[:5]]
+    for i in top_idx:
+        # Whole mileages print as ints, the way public_cases.json writes them
+        case_miles = miles[i].item()
+        if case_miles.is_integer():
+            case_miles = int(case_miles)
+        print('Case {}: {}d, {}mi, ${:.2f} -> Predicted: ${:.2f}, Actual: ${:.2f}, Error: ${:.2f}'.format(
+            i, days[i], case_miles, receipts[i],
+            predicted[i], expected[i], errors[i]))
 
-# Show a few high error cases
-print()
-print('Top high-error cases:')
-high_error_cases.sort(key=lambda x: x['error'], reverse=True)
-for case in high_error_cases[:5]:
-    inp = case['inputs']
-    print('Case {}: {}d, {}mi, ${:.2f} -> Predicted: ${:.2f}, Actual: ${:.2f}, Error: ${:.2f}'.format(
-        case['case'], inp['trip_duration_days'], inp['miles_traveled'], inp['total_receipts_amount'],
-        case['predicted'], case['actual'], case['error']))
+def main():
+    from error_table import DF
+    quick_eval(DF)
+
+if __name__ == '__main__':
+    main()
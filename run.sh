@@ -11,5 +11,6 @@ if [ $# -ne 3 ]; then
 fi
 
 # Use Python implementation with legacy calculation rules
-python3 calculate_reimbursement.py "$1" "$2" "$3" 
+# -S skips site-packages setup: the calculation is stdlib-only, and startup dominates each call
+python3 -S calculate_reimbursement.py "$1" "$2" "$3" 
 # python3 calculate_reimbursement_srv.py "$1" "$2" "$3" 
\ No newline at end of file
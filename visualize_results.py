@@ -4,29 +4,61 @@ Comprehensive visualization of results.json data.
 Creates multiple plots to analyze prediction accuracy and patterns.
 """
 
-import json
+import matplotlib
+matplotlib.use('Agg')  # figures are only saved to files, so skip interactive backend setup
 import matplotlib.pyplot as plt
 import numpy as np
 import seaborn as sns
-from collections import defaultdict
 import pandas as pd
+from case_cache import load_json
+
+MILEAGE_BIN_EDGES = np.array([0, 50, 100, 150, 200, 250, 300, np.inf])
+MILEAGE_BIN_LABELS = ['<50', '50-100', '100-150', '150-200', '200-250', '250-300', '300+']
+DURATION_BIN_EDGES = np.array([0, 3, 5, 7, 10, 15, np.inf])
+DURATION_BIN_LABELS = ['1-3', '4-5', '6-7', '8-10', '11-15', '15+']
 
 def load_results():
     """Load results from JSON file."""
-    with open('results.json', 'r') as f:
-        data = json.load(f)
-    return data
+    return load_json('results.json')
+
+def results_to_frame(data):
+    """Build the columnar DataFrame of per-case results shared by every report."""
+    df = pd.DataFrame(data['raw_results'])
+    # Right-closed mileage and duration bins (as pd.cut would give) from sorted-edge lookups; codes of -1 become NaN
+    codes = np.searchsorted(MILEAGE_BIN_EDGES, df['miles_per_day'].to_numpy(), side='left') - 1
+    df['mileage_bin'] = pd.Categorical.from_codes(codes, categories=MILEAGE_BIN_LABELS, ordered=True)
+    codes = np.searchsorted(DURATION_BIN_EDGES, df['trip_duration_days'].to_numpy(), side='left') - 1
+    df['duration_bin'] = pd.Categorical.from_codes(codes, categories=DURATION_BIN_LABELS, ordered=True)
+    return df
 
-def create_comprehensive_visualizations(data):
+def grouped_stats(codes, values, labels=None):
+    """
+    Mean, sample std and count of values per non-negative integer group code (negative codes are skipped),
+    from bincount passes instead of a pandas groupby. Rows are the observed groups, indexed by
+    code or by labels[code] when labels are given.
+    """
+    codes = np.asarray(codes)
+    values = np.asarray(values, dtype=np.float64)
+    keep = codes >= 0
+    codes, values = codes[keep], values[keep]
+    counts = np.bincount(codes)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        means = np.bincount(codes, weights=values) / counts
+        # Two passes: squared deviations from each group's own mean, so large amounts don't cancel
+        centered_sq = np.bincount(codes, weights=(values - means[codes]) ** 2)
+    observed = np.nonzero(counts)[0]
+    counts, means, centered_sq = counts[observed], means[observed], centered_sq[observed]
+    with np.errstate(divide='ignore', invalid='ignore'):  # single-case groups get a NaN std, as in pandas
+        stds = np.sqrt(np.maximum(centered_sq, 0) / (counts - 1))
+    stds[counts < 2] = np.nan
+    index = observed if labels is None else np.asarray(labels)[observed]
+    return pd.DataFrame({'mean': means, 'std': stds, 'count': counts}, index=index)
+
+def create_comprehensive_visualizations(data, df):
     """Create a comprehensive set of visualizations."""
     
-    # Extract raw results
-    results = data['raw_results']
     summary = data['summary_statistics']
     
-    # Convert to DataFrame for easier analysis
-    df = pd.DataFrame(results)
-    
     # Set up the plotting style
     plt.style.use('default')
     sns.set_palette("husl")
@@ -37,7 +69,7 @@ def create_comprehensive_visualizations(data):
     # 1. Prediction vs Expected Scatter Plot (top left)
     ax1 = plt.subplot(3, 4, 1)
     scatter = ax1.scatter(df['expected_output'], df['actual_output'], 
-                         alpha=0.6, c=df['absolute_error'], cmap='viridis', s=30)
+                         alpha=0.6, c=df['absolute_error'], cmap='viridis', s=30, rasterized=True)
     # Perfect prediction line
     min_val = min(df['expected_output'].min(), df['actual_output'].min())
     max_val = max(df['expected_output'].max(), df['actual_output'].max())
@@ -50,7 +82,9 @@ def create_comprehensive_visualizations(data):
     
     # 2. Error Distribution Histogram (top center-left)
     ax2 = plt.subplot(3, 4, 2)
-    ax2.hist(df['error'], bins=50, alpha=0.7, color='skyblue', edgecolor='black')
+    # One filled step patch instead of a Rectangle per bin
+    counts, edges = np.histogram(df['error'], bins=50)
+    ax2.stairs(counts, edges, fill=True, alpha=0.7, color='skyblue', edgecolor='black', linewidth=1)
     ax2.axvline(0, color='red', linestyle='--', linewidth=2, label='Perfect Prediction')
     ax2.axvline(df['error'].mean(), color='orange', linestyle='-', linewidth=2, 
                 label=f'Mean Error: ${df["error"].mean():.2f}')
@@ -62,7 +96,7 @@ def create_comprehensive_visualizations(data):
     
     # 3. Absolute Error by Trip Duration (top center-right)
     ax3 = plt.subplot(3, 4, 3)
-    duration_groups = df.groupby('trip_duration_days')['absolute_error'].agg(['mean', 'std', 'count'])
+    duration_groups = grouped_stats(df['trip_duration_days'], df['absolute_error'])
     duration_groups = duration_groups[duration_groups['count'] >= 5]  # Filter groups with enough samples
     ax3.errorbar(duration_groups.index, duration_groups['mean'], 
                 yerr=duration_groups['std'], marker='o', capsize=5, capthick=2)
@@ -73,11 +107,7 @@ def create_comprehensive_visualizations(data):
     
     # 4. Absolute Error by Miles per Day (top right)
     ax4 = plt.subplot(3, 4, 4)
-    # Create mileage bins
-    df['mileage_bin'] = pd.cut(df['miles_per_day'], 
-                              bins=[0, 50, 100, 150, 200, 250, 300, np.inf], 
-                              labels=['<50', '50-100', '100-150', '150-200', '200-250', '250-300', '300+'])
-    mileage_groups = df.groupby('mileage_bin', observed=True)['absolute_error'].agg(['mean', 'std', 'count'])
+    mileage_groups = grouped_stats(df['mileage_bin'].cat.codes, df['absolute_error'], MILEAGE_BIN_LABELS)
     ax4.bar(range(len(mileage_groups)), mileage_groups['mean'], 
             yerr=mileage_groups['std'], capsize=5, alpha=0.7)
     ax4.set_xlabel('Miles per Day')
@@ -89,7 +119,7 @@ def create_comprehensive_visualizations(data):
     
     # 5. Error vs Miles per Day Scatter (middle left)
     ax5 = plt.subplot(3, 4, 5)
-    ax5.scatter(df['miles_per_day'], df['error'], alpha=0.6, s=30)
+    ax5.scatter(df['miles_per_day'], df['error'], alpha=0.6, s=30, rasterized=True)
     ax5.axhline(0, color='red', linestyle='--', alpha=0.8)
     ax5.set_xlabel('Miles per Day')
     ax5.set_ylabel('Prediction Error ($)')
@@ -98,7 +128,7 @@ def create_comprehensive_visualizations(data):
     
     # 6. Error vs Trip Duration Scatter (middle center-left)
     ax6 = plt.subplot(3, 4, 6)
-    ax6.scatter(df['trip_duration_days'], df['error'], alpha=0.6, s=30)
+    ax6.scatter(df['trip_duration_days'], df['error'], alpha=0.6, s=30, rasterized=True)
     ax6.axhline(0, color='red', linestyle='--', alpha=0.8)
     ax6.set_xlabel('Trip Duration (days)')
     ax6.set_ylabel('Prediction Error ($)')
@@ -107,7 +137,7 @@ def create_comprehensive_visualizations(data):
     
     # 7. Receipts per Day vs Error (middle center-right)
     ax7 = plt.subplot(3, 4, 7)
-    ax7.scatter(df['receipts_per_day'], df['error'], alpha=0.6, s=30)
+    ax7.scatter(df['receipts_per_day'], df['error'], alpha=0.6, s=30, rasterized=True)
     ax7.axhline(0, color='red', linestyle='--', alpha=0.8)
     ax7.set_xlabel('Receipts per Day ($)')
     ax7.set_ylabel('Prediction Error ($)')
@@ -116,7 +146,8 @@ def create_comprehensive_visualizations(data):
     
     # 8. Percentage Error Distribution (middle right)
     ax8 = plt.subplot(3, 4, 8)
-    ax8.hist(df['percentage_error'], bins=50, alpha=0.7, color='lightcoral', edgecolor='black')
+    counts, edges = np.histogram(df['percentage_error'], bins=50)
+    ax8.stairs(counts, edges, fill=True, alpha=0.7, color='lightcoral', edgecolor='black', linewidth=1)
     ax8.axvline(0, color='red', linestyle='--', linewidth=2, label='Perfect Prediction')
     ax8.axvline(df['percentage_error'].mean(), color='orange', linestyle='-', linewidth=2,
                 label=f'Mean: {df["percentage_error"].mean():.1f}%')
@@ -128,11 +159,6 @@ def create_comprehensive_visualizations(data):
     
     # 9. Heatmap of Error by Duration and Mileage Bins (bottom left, spanning 2 columns)
     ax9 = plt.subplot(3, 4, (9, 10))
-    # Create duration bins
-    df['duration_bin'] = pd.cut(df['trip_duration_days'], 
-                               bins=[0, 3, 5, 7, 10, 15, np.inf],
-                               labels=['1-3', '4-5', '6-7', '8-10', '11-15', '15+'])
-    
     # Create pivot table for heatmap
     heatmap_data = df.pivot_table(values='error', 
                                  index='duration_bin', 
@@ -151,7 +177,7 @@ def create_comprehensive_visualizations(data):
     # Get top 20 highest absolute errors
     top_errors = df.nlargest(20, 'absolute_error')
     bars = ax10.bar(range(len(top_errors)), top_errors['absolute_error'], 
-                   color=['red' if x < 0 else 'blue' for x in top_errors['error']])
+                   color=np.where(top_errors['error'].to_numpy() < 0, 'red', 'blue'))
     ax10.set_xlabel('Case Rank (by Absolute Error)')
     ax10.set_ylabel('Absolute Error ($)')
     ax10.set_title('Top 20 Problematic Cases')
@@ -161,6 +187,11 @@ def create_comprehensive_visualizations(data):
     ax11 = plt.subplot(3, 4, 12)
     ax11.axis('off')
     
+    # Bracket counts straight from boolean masks, without materializing the filtered rows
+    abs_errors = df['absolute_error'].to_numpy()
+    within_50 = np.count_nonzero(abs_errors <= 50)
+    within_100 = np.count_nonzero(abs_errors <= 100)
+    
     # Create summary text
     summary_text = f"""
 ALGORITHM PERFORMANCE SUMMARY
@@ -183,8 +214,8 @@ Max Error: ${df['error'].max():.2f}
 EXTREME CASES:
 Worst Under-prediction: ${df['error'].min():.2f}
 Worst Over-prediction: ${df['error'].max():.2f}
-Cases within ±$50: {len(df[df['absolute_error'] <= 50])} ({len(df[df['absolute_error'] <= 50])/len(df)*100:.1f}%)
-Cases within ±$100: {len(df[df['absolute_error'] <= 100])} ({len(df[df['absolute_error'] <= 100])/len(df)*100:.1f}%)
+Cases within ±$50: {within_50} ({within_50/len(df)*100:.1f}%)
+Cases within ±$100: {within_100} ({within_100/len(df)*100:.1f}%)
 """
     
     ax11.text(0.05, 0.95, summary_text, transform=ax11.transAxes, fontsize=10,
@@ -197,24 +228,23 @@ Cases within ±$100: {len(df[df['absolute_error'] <= 100])} ({len(df[df['absolut
                  fontsize=16, fontweight='bold', y=0.98)
     
     # Save the plot
-    plt.savefig('comprehensive_results_analysis.png', dpi=300, bbox_inches='tight')
+    plt.savefig('comprehensive_results_analysis.png', dpi=150, bbox_inches='tight')
     print("Comprehensive visualization saved as 'comprehensive_results_analysis.png'")
     
     return fig
 
-def create_error_pattern_analysis(data):
+def create_error_pattern_analysis(df):
     """Create focused analysis of error patterns."""
-    results = data['raw_results']
-    df = pd.DataFrame(results)
     
     # Create a focused figure for error patterns
     fig, axes = plt.subplots(2, 3, figsize=(18, 12))
     
     # 1. Box plot of errors by trip duration
     ax1 = axes[0, 0]
-    duration_data = [df[df['trip_duration_days'] == d]['error'].values 
-                    for d in sorted(df['trip_duration_days'].unique())[:15]]  # Top 15 durations
-    duration_labels = sorted(df['trip_duration_days'].unique())[:15]
+    # One grouping pass instead of a boolean scan per duration
+    duration_errors = [(d, g.to_numpy()) for d, g in df.groupby('trip_duration_days')['error']][:15]  # Top 15 durations
+    duration_labels = [d for d, _ in duration_errors]
+    duration_data = [errors for _, errors in duration_errors]
     ax1.boxplot(duration_data, labels=duration_labels)
     ax1.set_xlabel('Trip Duration (days)')
     ax1.set_ylabel('Prediction Error ($)')
@@ -224,9 +254,6 @@ def create_error_pattern_analysis(data):
     
     # 2. Violin plot of errors by mileage bins
     ax2 = axes[0, 1]
-    df['mileage_bin'] = pd.cut(df['miles_per_day'], 
-                              bins=[0, 50, 100, 150, 200, 250, 300, np.inf], 
-                              labels=['<50', '50-100', '100-150', '150-200', '200-250', '250-300', '300+'])
     
     # Filter out bins with too few samples for violin plot
     valid_bins = df['mileage_bin'].value_counts()
@@ -256,7 +283,7 @@ def create_error_pattern_analysis(data):
     
     # 4. Error vs Total Reimbursement Amount
     ax4 = axes[1, 0]
-    ax4.scatter(df['expected_output'], df['error'], alpha=0.6, s=30)
+    ax4.scatter(df['expected_output'], df['error'], alpha=0.6, s=30, rasterized=True)
     ax4.axhline(0, color='red', linestyle='--', alpha=0.8)
     ax4.set_xlabel('Expected Reimbursement ($)')
     ax4.set_ylabel('Prediction Error ($)')
@@ -267,7 +294,7 @@ def create_error_pattern_analysis(data):
     ax5 = axes[1, 1]
     # Divide into percentile buckets
     df['expected_percentile'] = pd.qcut(df['expected_output'], q=10, labels=False)
-    percentile_stats = df.groupby('expected_percentile')['absolute_error'].agg(['mean', 'std', 'count'])
+    percentile_stats = grouped_stats(df['expected_percentile'], df['absolute_error'])
     ax5.errorbar(range(len(percentile_stats)), percentile_stats['mean'], 
                 yerr=percentile_stats['std'], marker='o', capsize=5, capthick=2)
     ax5.set_xlabel('Expected Output Percentile (0-9)')
@@ -299,15 +326,13 @@ def create_error_pattern_analysis(data):
     
     plt.tight_layout()
     plt.suptitle('Detailed Error Pattern Analysis', fontsize=16, fontweight='bold', y=0.98)
-    plt.savefig('error_pattern_analysis.png', dpi=300, bbox_inches='tight')
+    plt.savefig('error_pattern_analysis.png', dpi=150, bbox_inches='tight')
     print("Error pattern analysis saved as 'error_pattern_analysis.png'")
     
     return fig
 
-def print_detailed_statistics(data):
+def print_detailed_statistics(data, df):
     """Print detailed statistics about the results."""
-    results = data['raw_results']
-    df = pd.DataFrame(results)
     
     print("\n" + "="*60)
     print("DETAILED ANALYSIS RESULTS")
@@ -319,11 +344,17 @@ def print_detailed_statistics(data):
     print(f"   Median Absolute Error: ${df['absolute_error'].median():.2f}")
     print(f"   Correlation Coefficient: {data['summary_statistics']['correlation_coefficient']:.4f}")
     
+    abs_errors = df['absolute_error'].to_numpy()
+    within_25 = np.count_nonzero(abs_errors <= 25)
+    within_50 = np.count_nonzero(abs_errors <= 50)
+    within_100 = np.count_nonzero(abs_errors <= 100)
+    over_300 = np.count_nonzero(abs_errors > 300)
+    
     print(f"\n📈 ERROR DISTRIBUTION:")
-    print(f"   Cases within ±$25: {len(df[df['absolute_error'] <= 25]):,} ({len(df[df['absolute_error'] <= 25])/len(df)*100:.1f}%)")
-    print(f"   Cases within ±$50: {len(df[df['absolute_error'] <= 50]):,} ({len(df[df['absolute_error'] <= 50])/len(df)*100:.1f}%)")
-    print(f"   Cases within ±$100: {len(df[df['absolute_error'] <= 100]):,} ({len(df[df['absolute_error'] <= 100])/len(df)*100:.1f}%)")
-    print(f"   Cases with >$300 error: {len(df[df['absolute_error'] > 300]):,} ({len(df[df['absolute_error'] > 300])/len(df)*100:.1f}%)")
+    print(f"   Cases within ±$25: {within_25:,} ({within_25/len(df)*100:.1f}%)")
+    print(f"   Cases within ±$50: {within_50:,} ({within_50/len(df)*100:.1f}%)")
+    print(f"   Cases within ±$100: {within_100:,} ({within_100/len(df)*100:.1f}%)")
+    print(f"   Cases with >$300 error: {over_300:,} ({over_300/len(df)*100:.1f}%)")
     
     print(f"\n🎯 PREDICTION BIAS:")
     print(f"   Under-predictions: {data['summary_statistics']['under_predicted_cases']:,} ({data['summary_statistics']['under_prediction_rate']:.1f}%)")
@@ -333,17 +364,14 @@ def print_detailed_statistics(data):
     print(f"\n🔍 WORST PERFORMING SEGMENTS:")
     
     # Duration analysis
-    duration_errors = df.groupby('trip_duration_days')['error'].agg(['mean', 'count']).sort_values('mean')
+    duration_errors = grouped_stats(df['trip_duration_days'], df['error']).sort_values('mean')
     duration_errors = duration_errors[duration_errors['count'] >= 5]  # Filter reliable samples
     print(f"\n   Trip Duration (worst 3):")
     for duration, stats in duration_errors.head(3).iterrows():
         print(f"      {duration} days: ${stats['mean']:.2f} mean error ({stats['count']} cases)")
     
     # Mileage analysis
-    df['mileage_bin'] = pd.cut(df['miles_per_day'], 
-                              bins=[0, 50, 100, 150, 200, 250, 300, np.inf], 
-                              labels=['<50', '50-100', '100-150', '150-200', '200-250', '250-300', '300+'])
-    mileage_errors = df.groupby('mileage_bin', observed=True)['error'].agg(['mean', 'count']).sort_values('mean')
+    mileage_errors = grouped_stats(df['mileage_bin'].cat.codes, df['error'], MILEAGE_BIN_LABELS).sort_values('mean')
     print(f"\n   Mileage Range (worst 3):")
     for mileage, stats in mileage_errors.head(3).iterrows():
         print(f"      {mileage} mi/day: ${stats['mean']:.2f} mean error ({stats['count']} cases)")
@@ -368,17 +396,18 @@ def main():
     
     # Load the data
     data = load_results()
+    df = results_to_frame(data)
     
     # Create comprehensive visualizations
     print("\n📊 Generating comprehensive results analysis...")
-    create_comprehensive_visualizations(data)
+    create_comprehensive_visualizations(data, df)
     
     # Create focused error pattern analysis
     print("\n🔍 Generating detailed error pattern analysis...")
-    create_error_pattern_analysis(data)
+    create_error_pattern_analysis(df)
     
     # Print detailed statistics
-    print_detailed_statistics(data)
+    print_detailed_statistics(data, df)
     
     print(f"\n✅ VISUALIZATION COMPLETE!")
     print(f"   Generated files:")